@@ -1,4 +1,5 @@
 import os
+import hashlib
 import numpy as np
 from datetime import datetime
 from flask import Flask, render_template, request, redirect, url_for, flash, send_from_directory
@@ -6,14 +7,23 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_login import UserMixin
 from flask_bcrypt import Bcrypt
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine
 from werkzeug.utils import secure_filename
 
 from document_processing import ocr_extract, summarize_text, extract_tags, embed_text
+from document_processing import DEFAULT_EMBED_MODEL
 
 app = Flask(__name__)
 app.config["SECRET_KEY"] = "secret123"
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///app.db"
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DMS_DATABASE_URI", "sqlite:///app.db")
 app.config["UPLOAD_FOLDER"] = "uploads"
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_size": 10,
+    "max_overflow": 10,
+    "pool_pre_ping": True,
+    "connect_args": {"timeout": 30, "check_same_thread": False},
+}
 
 db = SQLAlchemy(app)
 bcrypt = Bcrypt(app)
@@ -34,9 +44,16 @@ class User(db.Model, UserMixin):
 
 
 class Document(db.Model):
+    __table_args__ = (
+        db.Index("ix_document_status_uploaded_at", "status", "uploaded_at"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     filename = db.Column(db.String(255), nullable=False)
+    # Name as uploaded; versions are matched on it. bulk_import.py stores
+    # files under a hash-prefixed filename, so the two can differ.
+    original_filename = db.Column(db.String(255))
     owner_id = db.Column(db.Integer, db.ForeignKey("user.id"))
 
     parent_id = db.Column(db.Integer, nullable=True)
@@ -46,6 +63,13 @@ class Document(db.Model):
     summary = db.Column(db.Text)
     tags = db.Column(db.String(255))
     embedding = db.Column(db.JSON)
+    embedding_model = db.Column(db.String(255))
+    content_hash = db.Column(db.String(64), index=True)
+
+    # Filled by reindex.py and swapped into embedding once every document
+    # has one, so search never mixes vectors from two models.
+    next_embedding = db.deferred(db.Column(db.JSON))
+    next_embedding_model = db.Column(db.String(255))
 
     status = db.Column(db.String(20), default="pending")
     approved_by = db.Column(db.Integer, nullable=True)
@@ -54,6 +78,13 @@ class Document(db.Model):
 
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    uploader = db.relationship("User")
+
+
+class Setting(db.Model):
+    key = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(255))
+
 
 class AuditLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -75,6 +106,54 @@ class AuditLog(db.Model):
     details = db.Column(db.Text)
 
 
+# =====================================================
+# SQLITE TUNING
+# =====================================================
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if type(dbapi_connection).__module__ != "sqlite3":
+        return
+
+    # WAL lets readers run alongside a writer, so several workers can share
+    # app.db without "database is locked" errors on every upload.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.close()
+
+
+def get_setting(key, default=None):
+    # A column query always reads the database, unlike session.get(), which
+    # can return a value cached earlier in the same session.
+    value = db.session.query(Setting.value).filter_by(key=key).scalar()
+    return value if value is not None else default
+
+
+def set_setting(key, value):
+    db.session.merge(Setting(key=key, value=value))
+
+
+def get_embedding_model():
+    return get_setting("embedding_model", DEFAULT_EMBED_MODEL)
+
+
+def restamp_embeddings(docs):
+    """Re-embeds docs whose embedding_model is no longer the active one.
+
+    Call after the docs are flushed: the pending INSERTs hold SQLite's write
+    lock, so a reindex.py swap cannot commit between this check and the
+    caller's commit. Without it, a swap during a slow upload or import would
+    leave rows tagged with the old model, out of semantic search."""
+    current = get_embedding_model()
+
+    for doc in docs:
+        if doc.embedding_model != current:
+            doc.embedding = embed_text(doc.summary, model_name=current) if doc.summary else None
+            doc.embedding_model = current
+
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -104,6 +183,42 @@ def log_action(action, document=None, old_status=None, new_status=None, details=
     db.session.add(log)
 
 
+def log_bulk_action(action, documents, new_status, details=None):
+    if not current_user.is_authenticated or not documents:
+        return
+
+    now = datetime.utcnow()
+
+    rows = [
+        dict(
+            user_id=current_user.id,
+            user_email=current_user.email,
+            user_role=current_user.role,
+            document_id=doc.id,
+            document_name=doc.filename,
+            action=action,
+            old_status=doc.status,
+            new_status=new_status,
+            version=doc.version,
+            timestamp=now,
+            details=details
+        )
+        for doc in documents
+    ]
+
+    db.session.bulk_insert_mappings(AuditLog, rows)
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+
+    return h.hexdigest()
+
+
 # =====================================================
 # SMART SEARCH (COSINE)
 # =====================================================
@@ -200,7 +315,8 @@ def dashboard():
     # SMART SEARCH
     if search_query and len(search_query) >= 2:
 
-        query_embedding = embed_text(search_query)
+        embedding_model = get_embedding_model()
+        query_embedding = embed_text(search_query, model_name=embedding_model)
         scored = []
 
         for doc in docs:
@@ -217,7 +333,7 @@ def dashboard():
                 keyword_score += 2
 
             semantic_score = 0
-            if doc.embedding:
+            if doc.embedding and doc.embedding_model == embedding_model:
                 semantic_score = cosine_similarity(query_embedding, doc.embedding)
 
             total_score = keyword_score + (semantic_score * 5)
@@ -266,6 +382,7 @@ def upload():
 
     if request.method == "POST":
         files = request.files.getlist("file")
+        uploaded = []
 
         for file in files:
             if file.filename == "":
@@ -274,14 +391,16 @@ def upload():
             filename = secure_filename(file.filename)
             save_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
             file.save(save_path)
+            content_hash = file_sha256(save_path)
 
             text = ocr_extract(save_path)
             summary = summarize_text(text)
             tags = extract_tags(text)
-            embedding = embed_text(summary)
+            embedding_model = get_embedding_model()
+            embedding = embed_text(summary, model_name=embedding_model)
 
             existing_doc = Document.query.filter_by(
-                filename=filename,
+                original_filename=filename,
                 owner_id=current_user.id
             ).order_by(Document.version.desc()).first()
 
@@ -294,6 +413,7 @@ def upload():
 
             doc = Document(
                 filename=filename,
+                original_filename=filename,
                 owner_id=current_user.id,
                 parent_id=parent_id,
                 version=new_version,
@@ -301,16 +421,22 @@ def upload():
                 summary=summary,
                 tags=",".join(tags) if tags else None,
                 embedding=embedding,
+                embedding_model=embedding_model,
+                content_hash=content_hash,
                 status="approved" if current_user.role == "admin" else "pending"
             )
 
             db.session.add(doc)
+            uploaded.append(doc)
 
             if new_version == 1:
                 log_action("UPLOAD", document=doc)
             else:
                 log_action("NEW_VERSION", document=doc, details="New version uploaded")
 
+        db.session.flush()
+        restamp_embeddings(uploaded)
+
         db.session.commit()
         flash("Uploaded successfully!", "success")
         return redirect(url_for("dashboard"))
@@ -371,6 +497,94 @@ def reject(doc_id):
     return render_template("reject_reason.html", doc=doc)
 
 
+@app.route("/pending")
+@login_required
+def pending():
+
+    if current_user.role != "admin":
+        return redirect(url_for("dashboard"))
+
+    docs = Document.query.options(
+        db.joinedload(Document.uploader)
+    ).filter_by(
+        status="pending"
+    ).order_by(Document.uploaded_at.asc()).all()
+
+    return render_template("pending.html", docs=docs)
+
+
+@app.route("/bulk_review", methods=["POST"])
+@login_required
+def bulk_review():
+
+    if current_user.role != "admin":
+        return redirect(url_for("dashboard"))
+
+    action = request.form.get("action")
+    reason = request.form.get("reason", "").strip() or None
+    doc_ids = [int(x) for x in request.form.getlist("doc_ids") if x.isdigit()]
+
+    if action not in ["approve", "reject"] or not doc_ids:
+        flash("Select at least one document.", "warning")
+        return redirect(url_for("pending"))
+
+    if action == "reject" and not reason:
+        flash("A reason is required to reject documents.", "danger")
+        return redirect(url_for("pending"))
+
+    new_status = "approved" if action == "approve" else "rejected"
+
+    # Only documents still pending are touched, so a stale page cannot
+    # flip a document another admin has already reviewed. The SELECT does
+    # not lock anything, so if another review lands before the UPDATE the
+    # row counts differ and the whole batch is read again.
+    for attempt in range(3):
+        docs = db.session.query(
+            Document.id, Document.filename, Document.version, Document.status
+        ).filter(
+            Document.id.in_(doc_ids),
+            Document.status == "pending"
+        ).all()
+
+        if not docs:
+            flash("No pending documents were selected.", "warning")
+            return redirect(url_for("pending"))
+
+        updated = Document.query.filter(
+            Document.id.in_([d.id for d in docs]),
+            Document.status == "pending"
+        ).update({
+            Document.status: new_status,
+            Document.approved_by: current_user.id,
+            Document.approved_at: datetime.utcnow(),
+            Document.rejection_reason: reason if action == "reject" else None
+        }, synchronize_session=False)
+
+        if updated == len(docs):
+            break
+
+        db.session.rollback()
+    else:
+        flash("Documents changed while reviewing, please try again.", "warning")
+        return redirect(url_for("pending"))
+
+    log_bulk_action(
+        "APPROVE" if action == "approve" else "REJECT",
+        docs,
+        new_status,
+        details=reason if action == "reject" else None
+    )
+
+    db.session.commit()
+
+    if action == "approve":
+        flash(f"Approved {len(docs)} document(s)!", "success")
+    else:
+        flash(f"Rejected {len(docs)} document(s)!", "danger")
+
+    return redirect(url_for("pending"))
+
+
 # =====================================================
 # DELETE
 # =====================================================
@@ -448,12 +662,47 @@ def admin_audit():
 # MAIN
 # =====================================================
 
-if __name__ == "__main__":
+def init_storage():
 
-    if not os.path.exists("uploads"):
-        os.makedirs("uploads")
+    if not os.path.exists(app.config["UPLOAD_FOLDER"]):
+        os.makedirs(app.config["UPLOAD_FOLDER"])
 
     with app.app_context():
         db.create_all()
 
+        # create_all() skips tables that already exist, so make sure
+        # columns and indexes added later also reach older databases.
+        table = Document.__table__
+        existing = {c["name"] for c in inspect(db.engine).get_columns(table.name)}
+
+        with db.engine.begin() as conn:
+            for column in table.columns:
+                if column.name not in existing:
+                    col_type = column.type.compile(dialect=db.engine.dialect)
+                    conn.execute(db.text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"
+                    ))
+
+            conn.execute(db.text(
+                "UPDATE document SET original_filename = filename "
+                "WHERE original_filename IS NULL"
+            ))
+
+            # Vectors stored before embedding_model existed all came from
+            # the default model.
+            conn.execute(
+                db.text(
+                    "UPDATE document SET embedding_model = :model "
+                    "WHERE embedding IS NOT NULL AND embedding_model IS NULL"
+                ),
+                {"model": DEFAULT_EMBED_MODEL}
+            )
+
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+
+
+if __name__ == "__main__":
+
+    init_storage()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,335 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import multiprocessing
+from functools import partial
+from datetime import datetime
+
+from werkzeug.utils import secure_filename
+
+import document_processing
+import inference_client
+from document_processing import ocr_extract, summarize_text, extract_tags, embed_text
+from app import app, db, User, Document, AuditLog, file_sha256, init_storage
+from app import get_embedding_model, restamp_embeddings
+
+
+SUPPORTED_EXTENSIONS = {".pdf", ".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp"}
+
+
+# =====================================================
+# CHECKPOINT
+# =====================================================
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return {"done": [], "failed": {}}
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    # Write then rename, so an interrupted run never leaves a half-written file.
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+
+    os.replace(tmp_path, path)
+
+
+# =====================================================
+# WORKERS
+# =====================================================
+
+def init_worker():
+    import torch
+
+    # Pool processes run side by side, so one torch thread each is enough.
+    torch.set_num_threads(1)
+
+
+def process_file(path, embedding_model=None):
+    try:
+        text = ocr_extract(path)
+
+        # ocr_extract() returns "" for corrupt or unreadable files instead of
+        # raising; importing those would hide them from --retry-failed.
+        if not text.strip():
+            return path, None, "no text could be extracted"
+
+        summary = summarize_text(text)
+        tags = extract_tags(text)
+        embedding = embed_text(summary, model_name=embedding_model)
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+    return path, {
+        "text": text,
+        "summary": summary,
+        "tags": ",".join(tags) if tags else None,
+        "embedding": embedding,
+        "embedding_model": embedding_model,
+    }, None
+
+
+# =====================================================
+# IMPORT
+# =====================================================
+
+def find_files(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                yield os.path.abspath(os.path.join(dirpath, name))
+
+
+def stored_name(path, content_hash):
+    # Archives repeat names like raspored.pdf or scan001.jpg across folders;
+    # the hash prefix keeps each file's stored name unique.
+    return f"{content_hash[:16]}_{secure_filename(os.path.basename(path))}"
+
+
+def store_file(path, filename, content_hash):
+    dest = os.path.join(app.config["UPLOAD_FOLDER"], filename)
+
+    if os.path.exists(dest):
+        # Left over from a run interrupted before its commit.
+        if file_sha256(dest) == content_hash:
+            return
+        raise FileExistsError(f"{dest} already exists with different content")
+
+    with open(path, "rb") as src, open(dest, "xb") as dst:
+        shutil.copyfileobj(src, dst)
+    shutil.copystat(path, dest)
+
+
+def insert_batch(batch, owner, status, versions, link_versions):
+    now = datetime.utcnow()
+    docs = []
+    touched = set()
+
+    for path, content_hash, result in batch:
+        filename = stored_name(path, content_hash)
+        store_file(path, filename, content_hash)
+
+        # Only with --link-versions: a repeated original name for the same
+        # owner becomes the next version, as on the upload form.
+        version_key = secure_filename(os.path.basename(path))
+        previous = versions.get(version_key) if link_versions else None
+        parent_id = None
+
+        if previous:
+            parent_id = previous["parent_id"]
+            if parent_id is None:
+                # The previous version is earlier in this batch; flush for its id.
+                db.session.flush()
+                parent_id = previous["doc"].id
+
+        doc = Document(
+            filename=filename,
+            original_filename=version_key,
+            owner_id=owner.id,
+            parent_id=parent_id,
+            version=previous["version"] + 1 if previous else 1,
+            content_hash=content_hash,
+            status=status,
+            approved_by=owner.id if status == "approved" else None,
+            approved_at=now if status == "approved" else None,
+            uploaded_at=now,
+            **result
+        )
+
+        db.session.add(doc)
+        docs.append(doc)
+        versions[version_key] = {"version": doc.version, "parent_id": parent_id, "doc": doc}
+        touched.add(version_key)
+
+    db.session.flush()
+
+    for key in touched:
+        doc = versions[key]["doc"]
+        versions[key] = {"version": doc.version, "parent_id": doc.parent_id or doc.id}
+
+    # The run may outlive a reindex.py swap; re-check the model under the lock.
+    restamp_embeddings(docs)
+
+    db.session.bulk_insert_mappings(AuditLog, [
+        dict(
+            user_id=owner.id,
+            user_email=owner.email,
+            user_role=owner.role,
+            document_id=doc.id,
+            document_name=doc.filename,
+            action="UPLOAD" if doc.version == 1 else "NEW_VERSION",
+            new_status=doc.status,
+            version=doc.version,
+            timestamp=now,
+            details="Bulk import"
+        )
+        for doc in docs
+    ])
+
+    db.session.commit()
+
+
+def run_import(args):
+    checkpoint = load_checkpoint(args.checkpoint)
+    done = set(checkpoint["done"])
+    failed = checkpoint["failed"]
+
+    owner = User.query.filter_by(email=args.owner).first()
+    if owner is None:
+        sys.exit(f"No user with email {args.owner}")
+
+    status = args.status or ("approved" if owner.role == "admin" else "pending")
+    embedding_model = get_embedding_model()
+
+    known_hashes = {
+        h for (h,) in db.session.query(Document.content_hash).filter(
+            Document.content_hash.isnot(None)
+        )
+    }
+
+    versions = {}
+    for name, version, parent_id, doc_id in db.session.query(
+        Document.original_filename, Document.version, Document.parent_id, Document.id
+    ).filter_by(owner_id=owner.id).order_by(Document.version):
+        versions[name] = {"version": version, "parent_id": parent_id or doc_id}
+
+    # Hashing is cheap next to OCR, so duplicates are dropped up front.
+    todo = {}
+    queued_hashes = set()
+    skipped = 0
+    errors = 0
+
+    for path in find_files(args.root):
+        if path in done or (path in failed and not args.retry_failed):
+            skipped += 1
+            continue
+
+        content_hash = file_sha256(path)
+        if content_hash in known_hashes or content_hash in queued_hashes:
+            done.add(path)
+            skipped += 1
+            continue
+
+        dest = os.path.join(app.config["UPLOAD_FOLDER"], stored_name(path, content_hash))
+        if os.path.exists(dest) and file_sha256(dest) != content_hash:
+            failed[path] = f"{dest} already exists with different content"
+            errors += 1
+            print(f"FAILED {path}: {failed[path]}")
+            continue
+
+        todo[path] = content_hash
+        queued_hashes.add(content_hash)
+
+    print(f"{len(todo)} file(s) to import, {skipped} skipped, {errors} failed")
+    if not todo:
+        checkpoint["done"] = sorted(done)
+        checkpoint["failed"] = failed
+        save_checkpoint(args.checkpoint, checkpoint)
+        return
+
+    # With fork the pool inherits the models loaded here; otherwise each worker
+    # loads its own copy (or talks to the inference server) on first use.
+    if not inference_client.INFERENCE_ADDRESS:
+        document_processing.load_models()
+        document_processing.load_embed_model(embedding_model)
+    document_processing.load_nlp()
+
+    # The pool must not inherit open SQLite connections.
+    db.session.close()
+    db.engine.dispose()
+
+    imported = 0
+    batch = []
+    start = time.time()
+
+    def flush():
+        nonlocal imported
+        if batch:
+            insert_batch(batch, owner, status, versions, args.link_versions)
+            imported += len(batch)
+            for path, _, _ in batch:
+                done.add(path)
+                failed.pop(path, None)
+            batch.clear()
+
+        checkpoint["done"] = sorted(done)
+        checkpoint["failed"] = failed
+        save_checkpoint(args.checkpoint, checkpoint)
+
+        elapsed = time.time() - start
+        print(f"  {imported} imported, {errors} failed, "
+              f"{imported / elapsed if elapsed else 0:.2f} files/s")
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("fork")
+    else:
+        ctx = multiprocessing.get_context()
+
+    # Linked versions must follow the (sorted) walk order, not whichever
+    # file finishes OCR first.
+    with ctx.Pool(args.workers, initializer=init_worker) as pool:
+        imap = pool.imap if args.link_versions else pool.imap_unordered
+
+        for path, result, error in imap(
+            partial(process_file, embedding_model=embedding_model), todo
+        ):
+            if error:
+                errors += 1
+                failed[path] = error
+                print(f"FAILED {path}: {error}")
+                continue
+
+            batch.append((path, todo[path], result))
+            if len(batch) >= args.batch_size:
+                flush()
+
+        flush()
+
+    elapsed = time.time() - start
+    print()
+    print(f"Imported {imported} file(s) in {elapsed:.1f}s "
+          f"({imported / elapsed if elapsed else 0:.2f} files/s)")
+    print(f"Skipped {skipped}, failed {errors}")
+
+    if failed:
+        print(f"Failures are recorded in {args.checkpoint}; "
+              f"rerun with --retry-failed to try them again.")
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import an existing archive of PDFs and scans into the DMS."
+    )
+    parser.add_argument("root", help="directory to import recursively")
+    parser.add_argument("--owner", required=True,
+                        help="email of the user the documents are uploaded as")
+    parser.add_argument("--status", choices=["pending", "approved"],
+                        help="status for imported documents (default: as the upload form)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=50,
+                        help="documents inserted per transaction")
+    parser.add_argument("--checkpoint", default="bulk_import_checkpoint.json")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="retry files that failed in an earlier run")
+    parser.add_argument("--link-versions", action="store_true",
+                        help="treat files with the same name as versions of one document "
+                             "(in path order), as the upload form does")
+    args = parser.parse_args()
+
+    init_storage()
+
+    with app.app_context():
+        run_import(args)
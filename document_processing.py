@@ -1,6 +1,7 @@
 import os
 import io
 import re
+import threading
 import fitz
 import pdfplumber
 import pytesseract
@@ -11,6 +12,9 @@ from transformers import T5ForConditionalGeneration, T5Tokenizer
 from sentence_transformers import SentenceTransformer
 import spacy
 
+import inference_client
+from inference_client import InferenceUnavailable
+
 
 # ============================================================
 # CONFIG
@@ -18,12 +22,67 @@ import spacy
 
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 
-nlp = spacy.load("en_core_web_sm")
-kw_model = KeyBERT()
-embed_model = SentenceTransformer("all-MiniLM-L6-v2")
+# Embeddings stored before models were recorded per document came from this.
+DEFAULT_EMBED_MODEL = "all-MiniLM-L6-v2"
+
+# Models are loaded on first use, so a process that talks to the inference
+# server never holds its own copy of T5 and the encoder.
+nlp = None
+kw_model = None
+embed_model = None
+embed_models = {}
+
+t5_model = None
+t5_tokenizer = None
+
+_load_lock = threading.RLock()
+
+
+def load_nlp():
+    global nlp
+
+    with _load_lock:
+        if nlp is None:
+            nlp = spacy.load("en_core_web_sm")
+
+    return nlp
+
+
+def load_embed_model(model_name=None):
+    model_name = model_name or DEFAULT_EMBED_MODEL
 
-t5_model = T5ForConditionalGeneration.from_pretrained("t5-base")
-t5_tokenizer = T5Tokenizer.from_pretrained("t5-base")
+    with _load_lock:
+        if model_name not in embed_models:
+            embed_models[model_name] = SentenceTransformer(model_name)
+
+    return embed_models[model_name]
+
+
+def load_models():
+    global kw_model, embed_model, t5_model, t5_tokenizer
+
+    if t5_model is not None:
+        return
+
+    with _load_lock:
+        if t5_model is not None:
+            return
+
+        embed_model = load_embed_model(DEFAULT_EMBED_MODEL)
+        # KeyBERT's default backbone is the same MiniLM, so share it.
+        kw_model = KeyBERT(model=embed_model)
+
+        t5_tokenizer = T5Tokenizer.from_pretrained("t5-base")
+        t5_model = T5ForConditionalGeneration.from_pretrained("t5-base")
+
+
+def _run(op, text, **kwargs):
+    # Only a missing server falls back to local models; errors raised by the
+    # server (InferenceError) go to the caller.
+    try:
+        return inference_client.request(op, text, **kwargs)
+    except InferenceUnavailable:
+        return BATCH_OPS[op]([text], **kwargs)[0]
 
 
 # ============================================================
@@ -86,24 +145,30 @@ def ocr_extract(path):
 # SUMMARIZATION (T5)
 # ============================================================
 
-def summarize_text(text, max_len=200):
+def _summary_prompt(text):
     cleaned = re.sub(r"\s+", " ", text.replace("\n", " "))
 
-    input_text = (
+    return (
         "Summarize the following university academic or administrative document "
         "in 3-5 clear professional sentences. Focus on institution, purpose, and key topics: "
         + cleaned[:3000]
     )
 
-    tokens = t5_tokenizer.encode(
-        input_text,
+
+def summarize_texts(texts, max_len=200):
+    load_models()
+
+    batch = t5_tokenizer(
+        [_summary_prompt(t) for t in texts],
         return_tensors="pt",
         max_length=512,
-        truncation=True
+        truncation=True,
+        padding=True
     )
 
     summary_ids = t5_model.generate(
-        tokens,
+        input_ids=batch.input_ids,
+        attention_mask=batch.attention_mask,
         max_length=max_len,
         min_length=60,
         length_penalty=2.0,
@@ -111,8 +176,14 @@ def summarize_text(text, max_len=200):
         early_stopping=True
     )
 
-    summary = t5_tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-    return summary.strip()
+    return [
+        t5_tokenizer.decode(ids, skip_special_tokens=True).strip()
+        for ids in summary_ids
+    ]
+
+
+def summarize_text(text, max_len=200):
+    return _run("summarize", text, max_len=max_len)
 
 
 # ============================================================
@@ -153,9 +224,26 @@ FACULTY_KEYWORDS = [
 ]
 
 
+def extract_keywords(texts, top_n=12):
+    load_models()
+
+    keywords = kw_model.extract_keywords(
+        list(texts),
+        top_n=top_n,
+        use_mmr=True,
+        diversity=0.6
+    )
+
+    # KeyBERT unwraps the result when it is given a single document.
+    if len(texts) == 1:
+        keywords = [keywords]
+
+    return [[(kw, float(score)) for kw, score in doc_kws] for doc_kws in keywords]
+
+
 def extract_tags(text, max_tags=12):
     raw = []
-    doc = nlp(text)
+    doc = load_nlp()(text)
 
     # A) NER
     for ent in doc.ents:
@@ -164,12 +252,7 @@ def extract_tags(text, max_tags=12):
 
     # B) KeyBERT
     try:
-        keywords = kw_model.extract_keywords(
-            text,
-            top_n=max_tags,
-            use_mmr=True,
-            diversity=0.6
-        )
+        keywords = _run("keywords", text, top_n=max_tags)
         for kw, score in keywords:
             if score > 0.4:
                 raw.append(kw)
@@ -222,9 +305,23 @@ def extract_tags(text, max_tags=12):
 # EMBEDDINGS
 # ============================================================
 
-def embed_text(text):
-    vec = embed_model.encode(text)
-    return vec.tolist()
+def embed_texts(texts, model_name=None):
+    model = load_embed_model(model_name)
+    vecs = model.encode(list(texts), batch_size=max(1, len(texts)))
+    return [v.tolist() for v in vecs]
+
+
+def embed_text(text, model_name=None):
+    return _run("embed", text, model_name=model_name)
+
+
+# Batched implementations behind each op; the inference server calls
+# these with many texts at once, the in-process fallback with one.
+BATCH_OPS = {
+    "embed": embed_texts,
+    "summarize": summarize_texts,
+    "keywords": extract_keywords,
+}
 
 
 # ============================================================
@@ -0,0 +1,23 @@
+import os
+import multiprocessing
+
+bind = os.environ.get("DMS_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("DMS_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("DMS_THREADS", 2))
+timeout = int(os.environ.get("DMS_TIMEOUT", 300))
+
+# Load the app (and the ML models) in the master before forking.
+preload_app = True
+wsgi_app = "wsgi:app"
+
+
+def post_fork(server, worker):
+    import torch
+    from app import app, db
+
+    # Each worker gets a fair share of the cores instead of every worker
+    # spawning one torch thread per core. server.cfg reflects -w overrides.
+    torch.set_num_threads(max(1, multiprocessing.cpu_count() // server.cfg.workers))
+
+    with app.app_context():
+        db.engine.dispose()
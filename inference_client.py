@@ -0,0 +1,147 @@
+import os
+import time
+import secrets
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+
+# ============================================================
+# CONFIG
+# ============================================================
+
+# Socket and key file live in a directory only the service user can open.
+RUNTIME_DIR = os.environ.get("DMS_RUNTIME_DIR", os.path.expanduser("~/.dms"))
+DEFAULT_ADDRESS = os.path.join(RUNTIME_DIR, "inference.sock")
+KEY_FILE = os.path.join(RUNTIME_DIR, "inference.key")
+
+# Unix socket path or host:port on loopback. When unset, document_processing
+# runs every model in-process.
+INFERENCE_ADDRESS = os.environ.get("DMS_INFERENCE_ADDRESS")
+
+# After a failed connect, wait this long before trying the server again.
+RETRY_AFTER = 30
+
+
+class InferenceUnavailable(Exception):
+    """The server could not be reached; the caller may run the op itself."""
+
+
+class InferenceError(Exception):
+    """The server ran the op and it failed; running it again locally would
+    fail the same way."""
+
+
+def parse_address(address):
+    if ":" in address and not address.startswith(("/", ".")):
+        host, port = address.rsplit(":", 1)
+        return (host, int(port))
+    return address
+
+
+def ensure_runtime_dir():
+    os.makedirs(RUNTIME_DIR, mode=0o700, exist_ok=True)
+    os.chmod(RUNTIME_DIR, 0o700)
+
+
+def load_authkey(create=False):
+    """Returns the shared key from $DMS_INFERENCE_AUTHKEY or the key file.
+
+    Connections are pickle-based, so there is no built-in default: the server
+    creates a random key file readable only by its user on first start."""
+    key = os.environ.get("DMS_INFERENCE_AUTHKEY")
+    if key:
+        return key.encode()
+
+    if not os.path.exists(KEY_FILE):
+        if not create:
+            return None
+
+        ensure_runtime_dir()
+        fd = os.open(KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+
+    with open(KEY_FILE) as f:
+        return f.read().strip().encode()
+
+
+# ============================================================
+# CLIENT
+# ============================================================
+
+_local = threading.local()
+_down_until = 0.0
+
+
+def _connection():
+    conn = getattr(_local, "conn", None)
+
+    if conn is None:
+        authkey = load_authkey()
+        if authkey is None:
+            raise InferenceUnavailable("no inference auth key configured")
+
+        conn = Client(parse_address(INFERENCE_ADDRESS), authkey=authkey)
+        _local.conn = conn
+
+    return conn
+
+
+def _drop_connection():
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+
+    if conn is not None:
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+
+def reset():
+    """Forgets this process's connection and retry backoff, e.g. in a
+    gunicorn master before it forks workers."""
+    global _down_until
+
+    _drop_connection()
+    _down_until = 0.0
+
+
+def is_enabled():
+    return bool(INFERENCE_ADDRESS) and time.monotonic() >= _down_until
+
+
+def request(op, text, **kwargs):
+    """Runs one item through the inference server, which may batch it with
+    requests from other processes.
+
+    Raises InferenceUnavailable when the server cannot be reached or does not
+    serve the requested embedding model, so callers can fall back to
+    in-process inference, and InferenceError when the server ran the op and
+    it failed."""
+    global _down_until
+
+    if not is_enabled():
+        raise InferenceUnavailable("inference server not configured")
+
+    try:
+        conn = _connection()
+        conn.send((op, text, kwargs))
+        status, result = conn.recv()
+    except (OSError, EOFError, AuthenticationError) as e:
+        _drop_connection()
+        _down_until = time.monotonic() + RETRY_AFTER
+        raise InferenceUnavailable(str(e))
+
+    if status == "unserved":
+        raise InferenceUnavailable(result)
+
+    if status != "ok":
+        raise InferenceError(result)
+
+    return result
+
+
+def served_embed_models():
+    return request("served_models", None)
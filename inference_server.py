@@ -0,0 +1,198 @@
+import os
+import time
+import queue
+import argparse
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+import document_processing
+from inference_client import (
+    DEFAULT_ADDRESS, INFERENCE_ADDRESS, ensure_runtime_dir, load_authkey, parse_address
+)
+
+
+# ============================================================
+# MICRO-BATCHING
+# ============================================================
+
+class _Request:
+
+    def __init__(self, op, text, kwargs):
+        self.op = op
+        self.text = text
+        self.kwargs = kwargs
+        self.reply = None
+        self.done = threading.Event()
+
+    def finish(self, status, result):
+        self.reply = (status, result)
+        self.done.set()
+
+
+class MicroBatcher:
+    """Collects requests from all connections and runs them as batches.
+
+    A batch is closed when it reaches max_batch items or when the oldest
+    request has waited max_latency seconds, whichever comes first. Requests
+    are grouped by op and keyword arguments before they hit the models.
+    Embeddings are only served for the models in embed_models."""
+
+    def __init__(self, embed_models, max_batch=32, max_latency=0.01):
+        self.embed_models = set(embed_models)
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self.queue = queue.Queue()
+
+    def submit(self, op, text, kwargs):
+        req = _Request(op, text, kwargs)
+        self.queue.put(req)
+        req.done.wait()
+        return req.reply
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.max_latency
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            groups = {}
+            for req in batch:
+                key = (req.op, tuple(sorted(req.kwargs.items())))
+                groups.setdefault(key, []).append(req)
+
+            for (op, kwargs), reqs in groups.items():
+                self._run_group(op, dict(kwargs), reqs)
+
+    def _run_group(self, op, kwargs, reqs):
+        fn = document_processing.BATCH_OPS.get(op)
+
+        if fn is None:
+            for req in reqs:
+                req.finish("error", f"unknown op: {op}")
+            return
+
+        if op == "embed":
+            model_name = kwargs.get("model_name") or document_processing.DEFAULT_EMBED_MODEL
+            if model_name not in self.embed_models:
+                for req in reqs:
+                    req.finish("unserved", f"embedding model not served: {model_name}")
+                return
+
+        try:
+            results = fn([req.text for req in reqs], **kwargs)
+        except Exception as e:
+            if len(reqs) == 1:
+                reqs[0].finish("error", str(e))
+                return
+
+            # One bad input should not fail everyone it was batched with.
+            for req in reqs:
+                self._run_group(op, kwargs, [req])
+            return
+
+        for req, result in zip(reqs, results):
+            req.finish("ok", result)
+
+
+# ============================================================
+# SERVER
+# ============================================================
+
+def handle_connection(conn, batcher):
+    with conn:
+        while True:
+            try:
+                op, text, kwargs = conn.recv()
+            except (EOFError, OSError):
+                return
+
+            if op == "served_models":
+                reply = ("ok", sorted(batcher.embed_models))
+            else:
+                reply = batcher.submit(op, text, kwargs)
+
+            try:
+                conn.send(reply)
+            except OSError:
+                return
+
+
+def open_listener(address, authkey):
+    if not isinstance(address, str):
+        return Listener(address, authkey=authkey)
+
+    if address == DEFAULT_ADDRESS:
+        ensure_runtime_dir()
+
+    if os.path.exists(address):
+        os.remove(address)
+
+    # Create the socket owner-only from the start, not chmod it afterwards.
+    old_umask = os.umask(0o177)
+    try:
+        return Listener(address, authkey=authkey)
+    finally:
+        os.umask(old_umask)
+
+
+def serve(address, embed_models, max_batch, max_latency):
+    authkey = load_authkey(create=True)
+
+    document_processing.load_models()
+    for model_name in embed_models:
+        document_processing.load_embed_model(model_name)
+
+    batcher = MicroBatcher(embed_models, max_batch=max_batch, max_latency=max_latency)
+    threading.Thread(target=batcher.run, daemon=True).start()
+
+    with open_listener(parse_address(address), authkey) as listener:
+        print(f"Inference server listening on {listener.address}")
+
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, OSError):
+                continue
+
+            threading.Thread(
+                target=handle_connection, args=(conn, batcher), daemon=True
+            ).start()
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve T5, MiniLM and KeyBERT to local processes with micro-batching."
+    )
+    parser.add_argument("--address", default=INFERENCE_ADDRESS or DEFAULT_ADDRESS,
+                        help="Unix socket path or host:port (default: $DMS_INFERENCE_ADDRESS "
+                             f"or {DEFAULT_ADDRESS})")
+    parser.add_argument("--embed-models",
+                        default=os.environ.get("DMS_EMBED_MODELS",
+                                               document_processing.DEFAULT_EMBED_MODEL),
+                        help="comma separated embedding models clients may request")
+    parser.add_argument("--max-batch", type=int,
+                        default=int(os.environ.get("DMS_INFERENCE_MAX_BATCH", 32)))
+    parser.add_argument("--max-latency-ms", type=float,
+                        default=float(os.environ.get("DMS_INFERENCE_MAX_LATENCY_MS", 10)),
+                        help="how long a request may wait for others to batch with")
+    args = parser.parse_args()
+
+    serve(
+        args.address,
+        [m.strip() for m in args.embed_models.split(",") if m.strip()],
+        args.max_batch,
+        args.max_latency_ms / 1000
+    )
@@ -0,0 +1,178 @@
+import os
+import sys
+import time
+import uuid
+import shutil
+import socket
+import argparse
+import threading
+import tempfile
+import subprocess
+import http.cookiejar
+import urllib.parse
+import urllib.request
+
+
+# =====================================================
+# HTTP CLIENT
+# =====================================================
+
+def make_client(base_url, email, password):
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+
+    data = urllib.parse.urlencode({"email": email, "password": password}).encode()
+    opener.open(base_url + "/login", data=data, timeout=30).read()
+
+    return opener
+
+
+def register_user(base_url, email, password):
+    data = urllib.parse.urlencode({
+        "email": email,
+        "password": password,
+        "role": "professor"
+    }).encode()
+
+    urllib.request.urlopen(base_url + "/register", data=data, timeout=30).read()
+
+
+def wait_for_port(host, port, timeout):
+    deadline = time.time() + timeout
+
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.5)
+
+    return False
+
+
+# =====================================================
+# LOAD RUN
+# =====================================================
+
+def run_load(base_url, path, email, password, concurrency, duration):
+    counts = [0] * concurrency
+    errors = [0] * concurrency
+    stop_at = time.time() + duration
+
+    def worker(i):
+        opener = make_client(base_url, email, password)
+
+        while time.time() < stop_at:
+            try:
+                opener.open(base_url + path, timeout=60).read()
+                counts[i] += 1
+            except Exception:
+                errors[i] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.time() - start
+
+    return sum(counts) / elapsed, sum(errors)
+
+
+def start_server(workers, bind, database_uri):
+    env = dict(
+        os.environ,
+        DMS_WORKERS=str(workers),
+        DMS_BIND=bind,
+        DMS_DATABASE_URI=database_uri
+    )
+
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def run_benchmark(args, host, port, base_url, database_uri, email, password):
+    results = []
+    registered = False
+
+    for n in [int(x) for x in args.workers.split(",")]:
+        server = start_server(n, args.bind, database_uri)
+
+        try:
+            if not wait_for_port(host, int(port), args.startup_timeout):
+                print(f"{n} worker(s): server did not start")
+                continue
+
+            if not registered:
+                register_user(base_url, email, password)
+                registered = True
+
+            # Warm-up so first-request costs do not skew the numbers.
+            run_load(base_url, args.path, email, password, n, 2)
+
+            rps, errors = run_load(
+                base_url, args.path, email, password, args.concurrency, args.duration
+            )
+            results.append((n, rps, errors))
+            print(f"{n} worker(s): {rps:.1f} req/s, {errors} error(s)")
+
+        finally:
+            server.terminate()
+            server.wait()
+
+    return results
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure request throughput of the gunicorn deployment "
+                    "for different worker counts."
+    )
+    parser.add_argument("--workers", default="1,2,4",
+                        help="comma separated worker counts to try")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=int, default=20,
+                        help="seconds of load per worker count")
+    parser.add_argument("--path", default="/dashboard?q=raspored",
+                        help="request path; the default runs a semantic search")
+    parser.add_argument("--bind", default="127.0.0.1:8765")
+    parser.add_argument("--startup-timeout", type=int, default=300,
+                        help="seconds to wait for the models to load")
+    args = parser.parse_args()
+
+    host, port = args.bind.rsplit(":", 1)
+    base_url = f"http://{args.bind}"
+
+    email = f"loadtest-{uuid.uuid4().hex[:8]}@example.com"
+    password = uuid.uuid4().hex
+
+    # The benchmark registers its own user, so it runs against a scratch
+    # database instead of instance/app.db.
+    tmp_dir = tempfile.mkdtemp(prefix="dms-loadtest-")
+    database_uri = "sqlite:///" + os.path.join(tmp_dir, "loadtest.db")
+
+    try:
+        results = run_benchmark(args, host, port, base_url, database_uri, email, password)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if results:
+        base = results[0][1] or 1
+        print()
+        print("workers  req/s    speedup  errors")
+        for n, rps, errors in results:
+            print(f"{n:<8} {rps:<8.1f} {rps / base:<8.2f} {errors}")
+
+
+if __name__ == "__main__":
+    main()
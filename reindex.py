@@ -0,0 +1,180 @@
+import sys
+import time
+import argparse
+
+import document_processing
+import inference_client
+from inference_client import InferenceUnavailable
+from app import app, db, Document, get_embedding_model, set_setting, init_storage
+
+
+# =====================================================
+# STAGING
+# =====================================================
+
+def pending_query(model_name, force):
+    query = db.session.query(Document.id, Document.summary).filter(
+        db.or_(
+            Document.next_embedding_model.is_(None),
+            Document.next_embedding_model != model_name
+        )
+    )
+
+    if not force:
+        query = query.filter(
+            db.or_(
+                Document.embedding_model.is_(None),
+                Document.embedding_model != model_name
+            )
+        )
+
+    return query
+
+
+def iter_batches(model_name, force, batch_size):
+    # Keyset pages rather than yield_per: each batch is committed before the
+    # next is read, and SQLite cannot keep a cursor open across those commits.
+    last_id = 0
+
+    while True:
+        rows = pending_query(model_name, force).filter(
+            Document.id > last_id
+        ).order_by(Document.id).limit(batch_size).all()
+
+        if not rows:
+            return
+
+        yield rows
+        last_id = rows[-1].id
+
+
+def stage_embeddings(model_name, force, batch_size):
+    done = 0
+    start = time.time()
+
+    for rows in iter_batches(model_name, force, batch_size):
+        with_summary = [r for r in rows if r.summary]
+        vectors = document_processing.embed_texts(
+            [r.summary for r in with_summary], model_name=model_name
+        ) if with_summary else []
+        by_id = {r.id: v for r, v in zip(with_summary, vectors)}
+
+        db.session.bulk_update_mappings(Document, [
+            {
+                "id": r.id,
+                "next_embedding": by_id.get(r.id),
+                "next_embedding_model": model_name,
+            }
+            for r in rows
+        ])
+        db.session.commit()
+
+        done += len(rows)
+        elapsed = time.time() - start
+        print(f"  {done} document(s) re-embedded, "
+              f"{done / elapsed if elapsed else 0:.1f} docs/s")
+
+    return done
+
+
+# =====================================================
+# SWAP
+# =====================================================
+
+def swap_index(model_name):
+    """Moves the staged vectors into place and switches search to the new
+    model in one transaction. Returns False, changing nothing, if documents
+    were uploaded with the old model while staging was running.
+
+    Uploads and imports still in flight when this commits see the new model
+    through restamp_embeddings() before their own commit."""
+
+    # The UPDATE takes SQLite's write lock first, so no upload can slip in
+    # between it and the check below.
+    db.session.query(Document).filter(
+        Document.next_embedding_model == model_name
+    ).update({
+        Document.embedding: Document.next_embedding,
+        Document.embedding_model: Document.next_embedding_model,
+        Document.next_embedding: None,
+        Document.next_embedding_model: None,
+    }, synchronize_session=False)
+
+    missing = db.session.query(Document.id).filter(
+        db.or_(
+            Document.embedding_model.is_(None),
+            Document.embedding_model != model_name
+        )
+    ).count()
+
+    if missing:
+        db.session.rollback()
+        return False
+
+    set_setting("embedding_model", model_name)
+    db.session.commit()
+    return True
+
+
+def check_inference_server(model_name):
+    if not inference_client.INFERENCE_ADDRESS:
+        return
+
+    try:
+        served = inference_client.served_embed_models()
+    except InferenceUnavailable as e:
+        print(f"Inference server not reachable ({e}); continuing")
+        return
+
+    # After the swap every search embeds its query with model_name, so the
+    # server has to serve it or each worker would load the model itself.
+    if model_name not in served:
+        sys.exit(
+            f"The inference server does not serve {model_name}. Restart it with "
+            f"--embed-models {','.join(served + [model_name])} and run again."
+        )
+
+
+def reindex(model_name, force, batch_size):
+    check_inference_server(model_name)
+
+    print(f"Current search model: {get_embedding_model()}")
+    print(f"Re-embedding with: {model_name}")
+
+    start = time.time()
+    total = 0
+
+    while True:
+        total += stage_embeddings(model_name, force, batch_size)
+
+        if swap_index(model_name):
+            break
+
+        print("New documents arrived during re-indexing, running another pass")
+
+    print()
+    print(f"Re-embedded {total} document(s) in {time.time() - start:.1f}s; "
+          f"search now uses {model_name}")
+
+
+# =====================================================
+# MAIN
+# =====================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-embed all documents with a new model and switch search "
+                    "over once every document has a new vector."
+    )
+    parser.add_argument("--model", default=document_processing.DEFAULT_EMBED_MODEL,
+                        help="sentence-transformers model name")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--force", action="store_true",
+                        help="also re-embed documents already on this model, "
+                             "e.g. after summaries were regenerated")
+    args = parser.parse_args()
+
+    init_storage()
+
+    with app.app_context():
+        reindex(args.model, args.force, args.batch_size)
@@ -0,0 +1,44 @@
+import gc
+
+import document_processing
+import inference_client
+from inference_client import InferenceUnavailable
+from app import app, db, get_embedding_model, init_storage
+
+init_storage()
+
+with app.app_context():
+    # After a reindex.py swap search uses a model other than the default.
+    embedding_model = get_embedding_model()
+
+    # Connections opened above must not be inherited by workers.
+    db.session.remove()
+    db.engine.dispose()
+
+# With gunicorn's preload_app this runs once in the master, and forked
+# workers share the model weights copy-on-write. When an inference server
+# owns the models, workers only need spaCy for tag extraction.
+document_processing.load_nlp()
+
+if not inference_client.INFERENCE_ADDRESS:
+    document_processing.load_models()
+    document_processing.load_embed_model(embedding_model)
+else:
+    try:
+        served = inference_client.served_embed_models()
+    except InferenceUnavailable as e:
+        served = None
+        print(f"Inference server not reachable ({e}); workers will fall back to local models")
+
+    if served is not None and embedding_model not in served:
+        raise RuntimeError(
+            f"The inference server does not serve the active embedding model "
+            f"{embedding_model}; restart it with --embed-models including it."
+        )
+
+    # Workers must not inherit the probe's connection or its backoff.
+    inference_client.reset()
+
+# Move everything loaded so far out of the collector's generations so that
+# gc passes in the workers do not touch (and copy) the model pages.
+gc.freeze()